@@ -96,6 +96,30 @@ artifacts.
 """
 from __future__ import division, print_function
 
+import collections
+import functools
+
+try:
+    from functools import lru_cache
+except ImportError:
+    # Python 2: functools has no lru_cache. The functions memoized in
+    # this module take at most one short, hashable argument, so a
+    # minimal unbounded stand-in covers them.
+    def lru_cache(maxsize=None):
+        def decorate(func):
+            cache = {}
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items())))
+                try:
+                    return cache[key]
+                except KeyError:
+                    cache[key] = result = func(*args, **kwargs)
+                    return result
+            return wrapper
+        return decorate
+
 
 #: Program name, for display.
 #: Not marked for translation, but that can change if it enhances things.
@@ -232,16 +256,152 @@ def _compatibility(target_version_fields, current_version_fields):
 
 # Release building magic
 
+#: What _get_versions() returns: the three version strings, unpackable
+#: as a plain tuple, with named attribute access for callers that reuse
+#: individual fields several times.
+_Versions = collections.namedtuple("_Versions", "base formal ceremonial")
+
+#: Template for parsing `git describe` output.
+#: The base version has to be substituted in (suitably escaped) before
+#: compilation. Kept as a plain string, like the pattern below, so that
+#: importing this module at application startup costs nothing: the
+#: regexes are only ever compiled - once - by build scripting.
+_PARSE_PATTERN_TEMPLATE = (
+    r'^v{base_version}'    # Expected base version.
+    r'(?:-(\d+))?'         # 1: Number of commits since the tag.
+    r'(?:-g([0-9a-f]+))?'  # 2: Abbr'd SHA of the git tree exported.
+    r'(?:-(dirty))?'       # 3: Highlight uncommitted changes.
+    r'$'
+)
+
+#: Matches a bare abbreviated git revision SHA.
+_OBJSHA_PATTERN = r'^([0-9a-f]{7,})$'
+
+
+@lru_cache(maxsize=4)
+def _describe_parser(base_version):
+    """Returns the compiled `git describe` parser for a base version.
+
+    Compilation only happens when build scripting actually has some
+    `git describe` output to parse, and at most once per base version
+    thanks to the cache: the same goes for the re.escape() call, which
+    walks the version string character by character. On the steady
+    build path the base version is always the MYPAINT_VERSION constant
+    - only a release_info override can introduce another one, and that
+    branch never consults git - so in practice a single cache entry
+    gets compiled once and hit thereafter.
+
+    >>> r = _describe_parser("2.0.0-beta.0")
+    >>> r.match("v2.0.0-beta.0-42-gabc1234").groups()
+    ('42', 'abc1234', None)
+    >>> r.match("v2.0.0-beta.0-0-gabc1234-dirty").groups()
+    ('0', 'abc1234', 'dirty')
+
+    """
+    import re
+    escaped_version = re.escape(base_version)
+    return re.compile(
+        _PARSE_PATTERN_TEMPLATE.format(base_version=escaped_version),
+        re.IGNORECASE,
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_objsha_re():
+    """Returns the compiled bare-SHA regex, compiling it on first use."""
+    import re
+    return re.compile(_OBJSHA_PATTERN, re.IGNORECASE)
+
+
+_GIT_DESCRIBE_CMD = ["git", "describe", "--tags", "--long", "--dirty",
+                     "--always"]
+
+
+@lru_cache(maxsize=1)
+def _git_exe():
+    """Returns the path of the git executable, searching PATH only once.
+
+    Spawning ["git", ...] repeats the PATH search inside execvp for
+    every subprocess. Falls back to the bare command name when git
+    isn't on PATH at all, leaving error reporting to the call sites.
+
+    """
+    import shutil
+    try:
+        which = shutil.which
+    except AttributeError:
+        # Python 2: shutil has no which().
+        from distutils.spawn import find_executable as which
+    return which("git") or "git"
+
+
+#: Cached raw output of `git describe`, so that the subprocess gets
+#: spawned at most once per process however often it's asked for.
+_GIT_DESCRIBE = None
+
+#: Set after a failed `git describe`, so that later calls don't pile
+#: more subprocess attempts onto a git that's already shown itself to
+#: be broken or missing.
+_GIT_DESCRIBE_FAILED = False
+
+
+def _git_describe():
+    """Returns the stripped output of `git describe`, invoking it once.
+
+    Must only be called from within a working git repository. Git's own
+    error output is discarded so that it can't pollute the logs of
+    parallel build scripting; failures surface to the caller as the
+    usual subprocess exceptions, and are remembered so that a failing
+    git is only ever forked once.
+
+    """
+    global _GIT_DESCRIBE, _GIT_DESCRIBE_FAILED
+    if _GIT_DESCRIBE is None:
+        import os
+        import subprocess
+        if _GIT_DESCRIBE_FAILED:
+            raise OSError(
+                "%r failed earlier in this process, not retrying"
+                % (" ".join(_GIT_DESCRIBE_CMD), )
+            )
+        cmd = [_git_exe()] + _GIT_DESCRIBE_CMD[1:]
+        if os.environ.get("CI"):
+            # CI checkouts are clean by construction, and --dirty makes
+            # git scan the whole working tree for changes. The parser
+            # regex treats the dirty suffix as optional anyway.
+            cmd.remove("--dirty")
+        try:
+            # subprocess.DEVNULL is Python 3.3+; open os.devnull
+            # ourselves on Python 2.
+            devnull = getattr(subprocess, "DEVNULL", None)
+            if devnull is None:
+                devnull = open(os.devnull, "w")
+            _GIT_DESCRIBE = subprocess.check_output(
+                cmd,
+                universal_newlines=True,
+                stderr=devnull,
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            _GIT_DESCRIBE_FAILED = True
+            raise
+    return _GIT_DESCRIBE
+
+
+@lru_cache(maxsize=None)
 def _get_versions(gitprefix="gitexport"):
     """Gets all version strings for use in release/build scripting.
 
     :param str gitprefix: how to denote git-derived build metainfo
-    :rtype: tuple
+    :rtype: _Versions
     :returns: all 3 version strings: (base, formal, ceremonial)
 
     This function must only be called by Python build scripts,
     or by release.sh (which invokes the interpreter).
 
+    The result is cached: build scripting tends to call this several
+    times per invocation, and the underlying `git describe` subprocess
+    is by far the most expensive thing this module does.
+
     It assumes that the current working directory is either the
     one-level-down directory in an unpacked export generated by
     release.sh (when a `release_info` file exists), or a working git
@@ -251,7 +411,7 @@ def _get_versions(gitprefix="gitexport"):
     to derive the additional information.
 
     """
-    import re
+    import ast
     import os
     import sys
     import subprocess
@@ -260,11 +420,33 @@ def _get_versions(gitprefix="gitexport"):
     base_version = MYPAINT_VERSION
     formal_version = base_version
     ceremonial_version = formal_version + "+unknown"
-    if os.path.isfile("release_info"):
-        # If release information from release.sh exists, use that
+    # One scan of the working directory covers both filesystem tests
+    # below: DirEntry's is_file()/is_dir() reuse the stat info from the
+    # directory read instead of stat()ing each name again.
+    if hasattr(os, "scandir"):
+        try:
+            entries = {entry.name: entry for entry in os.scandir(".")}
+        except OSError:
+            entries = {}
+        have_release_info = ("release_info" in entries
+                             and entries["release_info"].is_file())
+        have_git_dir = ".git" in entries and entries[".git"].is_dir()
+    else:
+        # Python 2: no os.scandir, so pay for the two stat calls.
+        have_release_info = os.path.isfile("release_info")
+        have_git_dir = os.path.isdir(".git")
+    if have_release_info:
+        # If release information from release.sh exists, use that.
+        # The file consists of KEY=repr(value) lines (see
+        # _get_release_info_script), so a simple line parser with
+        # ast.literal_eval() covers it without exec()ing anything.
         relinfo = {}
-        with open("release_info", "rb") as relinfo_fp:
-            exec(relinfo_fp, relinfo)
+        with open("release_info", "r") as relinfo_fp:
+            for line in relinfo_fp:
+                key, sep, value = line.partition("=")
+                if not sep:
+                    continue
+                relinfo[key.strip()] = ast.literal_eval(value.strip())
         base_version = relinfo.get(
             "MYPAINT_VERSION_BASE",
             base_version,
@@ -280,43 +462,36 @@ def _get_versions(gitprefix="gitexport"):
     elif base_version.endswith("-alpha"):
         # There will be no matching git tag for initial alpha (active
         # development) phases.
-        if os.path.isdir(".git"):
+        if have_git_dir:
             cmd = ["git", "rev-parse", "--short", "HEAD"]
             try:
-                objsha = subprocess.check_output(cmd, universal_newlines=True)
-            except:
+                objsha = subprocess.check_output(
+                    [_git_exe()] + cmd[1:],
+                    universal_newlines=True,
+                ).strip()
+            except (OSError, subprocess.CalledProcessError):
                 print("ERROR: Failed to invoke %r. Build will be marked as "
                       "unsupported." % (" ".join(cmd), ),
                       file=sys.stderr)
             else:
-                build_ids = [gitprefix, objsha.strip()]
+                build_ids = [gitprefix, objsha]
                 build_metadata = ".".join(build_ids)
                 ceremonial_version = "{}+{}".format(
                     formal_version,
                     build_metadata,
                 )
-    elif os.path.isdir(".git"):
+    elif have_git_dir:
         # Pull the additional info from git.
-        cmd = ["git", "describe", "--tags", "--long", "--dirty", "--always"]
         try:
-            git_desc = subprocess.check_output(cmd, universal_newlines=True)
-        except:
+            git_desc = _git_describe()
+        except (OSError, subprocess.CalledProcessError):
             print("ERROR: Failed to invoke %r. Build will be marked as "
-                  "unsupported." % (" ".join(cmd), ),
+                  "unsupported." % (" ".join(_GIT_DESCRIBE_CMD), ),
                   file=sys.stderr)
         else:
-            git_desc = git_desc.strip()
             # If MYPAINT_VERSION matches the most recent tag in git,
             # then use the extra information from `git describe`.
-            parse_pattern = r'''
-                ^ v{base_version}   #  Expected base version.
-                (?:-(\d+))?         #1 Number of commits since the tag.
-                (?:-g([0-9a-f]+))?  #2 Abbr'd SHA of the git tree exported.
-                (?:-(dirty))?       #3 Highlight uncommitted changes.
-                $
-            '''.rstrip().format(base_version = re.escape(base_version))
-            parse_re = re.compile(parse_pattern, re.VERBOSE|re.IGNORECASE)
-            match = parse_re.match(git_desc)
+            match = _describe_parser(base_version).match(git_desc)
             objsha = None
             nrevs = 0
             dirty = None
@@ -326,7 +501,7 @@ def _get_versions(gitprefix="gitexport"):
                 print("WARNING: Failed to parse output of \"{cmd}\". "
                       "The base MYPAINT_VERSION ({ver}) from the code "
                       "should be present in the output of this command "
-                      "({git_desc}).".format(cmd=" ".join(cmd),
+                      "({git_desc}).".format(cmd=" ".join(_GIT_DESCRIBE_CMD),
                                              git_desc=repr(git_desc),
                                              ver=base_version),
                       file=sys.stderr)
@@ -339,21 +514,23 @@ def _get_versions(gitprefix="gitexport"):
                         cmd=" ".join(cmd)),
                     file=sys.stderr)
                 try:
-                    cmdout = subprocess.check_output(cmd,
-                                                     universal_newlines=True)
-                except:
+                    cmdout = subprocess.check_output(
+                        [_git_exe()] + cmd[1:],
+                        universal_newlines=True,
+                    ).strip()
+                except (OSError, subprocess.CalledProcessError):
                     print("ERROR: Failed to invoke %r. Build will be marked "
                           "as unsupported." % (" ".join(cmd), ),
                           file=sys.stderr)
                 else:
-                    cmdout = cmdout.strip()
-                if re.match(r'^([0-9a-f]{7,})$', cmdout, re.I):
-                    objsha = cmdout
-                else:
-                    print("WARNING: Output of {cmd} ({output}) does not look "
-                          "like a git revision SHA.".format(cmd=" ".join(cmd),
-                                                            output=cmdout),
-                          file=sys.stderr)
+                    if _get_objsha_re().match(cmdout):
+                        objsha = cmdout
+                    else:
+                        print("WARNING: Output of {cmd} ({output}) does not "
+                              "look like a git revision SHA.".format(
+                                  cmd=" ".join(cmd),
+                                  output=cmdout),
+                              file=sys.stderr)
             # nrevs is None or zero if this commit is the matched tag.
             # If not, then incorporate the numbers somehow.
             if nrevs and int(nrevs)>0:
@@ -397,22 +574,43 @@ def _get_versions(gitprefix="gitexport"):
                 )
     else:
         pass
-    return (base_version, formal_version, ceremonial_version)
+    return _Versions(base_version, formal_version, ceremonial_version)
 
 
+@lru_cache(maxsize=None)
 def _get_release_info_script(gitprefix="gitexport"):
     """Returns a script fragment describing the release.
 
     Like _get_versions(), this must only be called from build scripting
-    or similar machinery. The returned string can be processed by either
-    Python or Bourne Shell.
+    or similar machinery, and its result is cached for the same reason.
+    The returned string can be processed by either Python or Bourne
+    Shell.
 
     """
+    import os
+    # A release_info already on disk is exactly the script this
+    # function would regenerate. If there's no git repository to have
+    # moved on since (an unpacked export), or HEAD hasn't changed since
+    # the file was written, return its contents directly: no git, no
+    # parsing, no subprocess.
+    try:
+        relinfo_mtime = os.path.getmtime("release_info")
+    except OSError:
+        relinfo_mtime = None
+    if relinfo_mtime is not None:
+        try:
+            head_mtime = os.path.getmtime(os.path.join(".git", "HEAD"))
+        except OSError:
+            head_mtime = None
+        if head_mtime is None or relinfo_mtime >= head_mtime:
+            with open("release_info", "r") as relinfo_fp:
+                return relinfo_fp.read()
     base, formal, ceremonial = _get_versions(gitprefix=gitprefix)
-    release_info = "MYPAINT_VERSION_BASE=%r\n" % (base,)
-    release_info += "MYPAINT_VERSION_FORMAL=%r\n" % (formal,)
-    release_info += "MYPAINT_VERSION_CEREMONIAL=%r\n" % (ceremonial,)
-    return release_info
+    return (
+        "MYPAINT_VERSION_BASE=%r\n"
+        "MYPAINT_VERSION_FORMAL=%r\n"
+        "MYPAINT_VERSION_CEREMONIAL=%r\n"
+    ) % (base, formal, ceremonial)
 
 
 # release.sh expects to be able to run this file as __main__, and uses